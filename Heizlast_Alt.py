@@ -1,6 +1,9 @@
-import math
+import json
+import numpy as np
 import streamlit as st
 
+from heizlast_kernels import NUMBA_AVAILABLE, _compute_kernel, _geometry_numeric
+
 
 def calculate_heating_demand(volume_m3: float, heat_loss_factor_W_per_m3K: float, delta_t_K: float) -> float:
     """
@@ -10,9 +13,10 @@ def calculate_heating_demand(volume_m3: float, heat_loss_factor_W_per_m3K: float
     Returns:
         Heizlast in kW
     """
-    return volume_m3 * heat_loss_factor_W_per_m3K * delta_t_K / 1000.0
+    return volume_m3 * heat_loss_factor_W_per_m3K * delta_t_K * 1e-3
 
 
+@st.cache_data(show_spinner=False, max_entries=256)
 def _geometry(length_a_m: float,
               length_b_m: float,
               room_height_m: float,
@@ -22,21 +26,15 @@ def _geometry(length_a_m: float,
               window_area_m2: float) -> dict:
     """
     Geometrie für rechteckigen Grundriss mit Satteldach.
-    """
-    floor_area_single = length_a_m * length_b_m
-    gross_floor_area = floor_area_single * floors
-    volume = floor_area_single * room_height_m * floors
 
-    # vereinfachte Dachfläche (wie im Original): geneigte Fläche als Projektion / cos(pitch)
-    pitch_rad = math.radians(roof_pitch_deg)
-    cos_pitch = max(math.cos(pitch_rad), 1e-6)
-    if ridge_axis == "A":
-        roof_area = (length_b_m / cos_pitch) * length_a_m
-    else:
-        roof_area = (length_a_m / cos_pitch) * length_b_m
-
-    wall_area_gross = (length_a_m + length_b_m) * room_height_m * floors
-    wall_area_net = max(wall_area_gross - window_area_m2, 0.0)
+    Gecacht: Streamlit führt das Skript bei jeder Widget-Änderung neu aus,
+    bei unveränderten Eingaben wird das Ergebnis aus dem Cache geliefert.
+    """
+    (floor_area_single, gross_floor_area, volume, roof_area,
+     wall_area_gross, wall_area_net, window_area) = _geometry_numeric(
+        float(length_a_m), float(length_b_m), float(room_height_m), int(floors),
+        float(roof_pitch_deg), ridge_axis == "A", float(window_area_m2)
+    )
 
     return {
         "floor_area_single": floor_area_single,
@@ -45,10 +43,11 @@ def _geometry(length_a_m: float,
         "roof_area": roof_area,
         "wall_area_gross": wall_area_gross,
         "wall_area_net": wall_area_net,
-        "window_area": window_area_m2,
+        "window_area": window_area,
     }
 
 
+@st.cache_data(show_spinner=False, max_entries=256)
 def calculate_heating_demand_detailed(length_a_m: float,
                                      length_b_m: float,
                                      room_height_m: float,
@@ -72,16 +71,12 @@ def calculate_heating_demand_detailed(length_a_m: float,
     """
     geom = _geometry(length_a_m, length_b_m, room_height_m, floors, roof_pitch_deg, ridge_axis, window_area_m2)
 
-    q_wall_kW = u_wall_W_m2K * geom["wall_area_net"] * delta_t_K / 1000.0
-    q_roof_kW = u_roof_W_m2K * geom["roof_area"] * delta_t_K / 1000.0
-
-    # Bodenplatte typischerweise nur EG-Grundfläche (nicht *floors)
-    q_floor_kW = u_floor_W_m2K * geom["floor_area_single"] * delta_t_K / 1000.0
-
-    q_window_kW = u_window_W_m2K * geom["window_area"] * delta_t_K / 1000.0
-
+    q_wall_kW, q_roof_kW, q_floor_kW, q_window_kW, q_infil_kW = _compute_kernel(
+        np.float64(u_wall_W_m2K), np.float64(u_roof_W_m2K), np.float64(u_floor_W_m2K), np.float64(u_window_W_m2K),
+        np.float64(infiltration_W_m3K), np.float64(delta_t_K) * 1e-3,
+        geom["wall_area_net"], geom["roof_area"], geom["floor_area_single"], geom["volume"], geom["window_area"]
+    )
     q_hull_kW = q_wall_kW + q_roof_kW + q_floor_kW + q_window_kW
-    q_infil_kW = infiltration_W_m3K * geom["volume"] * delta_t_K / 1000.0
 
     parts = {
         "Wand": q_wall_kW,
@@ -94,6 +89,56 @@ def calculate_heating_demand_detailed(length_a_m: float,
     return q_hull_kW + q_infil_kW, q_infil_kW, q_hull_kW, parts, geom
 
 
+def sweep_delta_t(delta_t_K, dtype=np.float32, **fixed) -> np.ndarray:
+    """
+    Gesamtheizlast [kW] für ein ganzes Array von ΔT-Werten in einem Schritt.
+
+    `fixed` enthält alle übrigen Argumente von calculate_heating_demand_detailed
+    (als Keyword-Argumente). Standardmäßig in float32 gerechnet (doppelt so viele
+    SIMD-Lanes) für Batch-/Monte-Carlo-Studien; für die Anzeige dtype=np.float64 übergeben.
+    """
+    dtype = np.dtype(dtype).type
+    geom = _geometry(fixed["length_a_m"], fixed["length_b_m"], fixed["room_height_m"], fixed["floors"],
+                     fixed["roof_pitch_deg"], fixed["ridge_axis"], fixed["window_area_m2"])
+    scale = np.asarray(delta_t_K, dtype=dtype) * dtype(1e-3)
+    parts = _compute_kernel(
+        dtype(fixed["u_wall_W_m2K"]), dtype(fixed["u_roof_W_m2K"]), dtype(fixed["u_floor_W_m2K"]),
+        dtype(fixed["u_window_W_m2K"]), dtype(fixed["infiltration_W_m3K"]), scale,
+        dtype(geom["wall_area_net"]), dtype(geom["roof_area"]), dtype(geom["floor_area_single"]),
+        dtype(geom["volume"]), dtype(geom["window_area"])
+    )
+    return sum(parts)
+
+
+# Argumentnamen von calculate_heating_demand_detailed in Aufrufreihenfolge
+_DETAILED_INPUT_KEYS = (
+    "length_a_m", "length_b_m", "room_height_m", "floors", "roof_pitch_deg", "ridge_axis",
+    "u_wall_W_m2K", "u_roof_W_m2K", "u_floor_W_m2K", "infiltration_W_m3K", "delta_t_K",
+    "u_window_W_m2K", "window_area_m2",
+)
+
+
+def _to_json_bytes(inputs: tuple, result: tuple) -> bytes:
+    """
+    Ergebnis der detaillierten Berechnung als JSON (UTF-8) für den Download.
+
+    `inputs` ist das Argument-Tupel von calculate_heating_demand_detailed,
+    `result` dessen Rückgabewert.
+    """
+    total_kW, q_infil_kW, q_hull_kW, parts, geom = result
+    payload = {
+        "inputs": dict(zip(_DETAILED_INPUT_KEYS, inputs)),
+        "geometry": geom,
+        "results_kW": {
+            "total": total_kW,
+            "hull": q_hull_kW,
+            "infiltration": q_infil_kW,
+            "parts": parts,
+        }
+    }
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
 def _preset_defaults(preset: str) -> dict:
     """
     Sehr grobe Default-Werte (als Startpunkt) – Nutzer kann immer nachjustieren.
@@ -107,10 +152,27 @@ def _preset_defaults(preset: str) -> dict:
     return presets.get(preset, presets["Teilsaniert"])
 
 
+@st.cache_resource(show_spinner=False)
+def _warm_up_kernels() -> None:
+    """
+    Kompiliert die Numba-Kerne einmal pro Prozess mit repräsentativen Werten.
+
+    Die Kerne liegen in heizlast_kernels, das Streamlit bei Reruns nicht neu ausführt;
+    die kompilierten Spezialisierungen bleiben so für alle späteren Klicks geladen.
+    """
+    _geometry_numeric(10.0, 5.0, 3.0, 1, 30.0, True, 25.0)
+    _compute_kernel(1.6, 1.2, 1.0, 4.8, 0.2, 0.02, 120.0, 57.7, 50.0, 150.0, 25.0)
+    # float64-Array-Variante für die Sensitivitätskurve (sweep_delta_t)
+    _compute_kernel(1.6, 1.2, 1.0, 4.8, 0.2, np.linspace(0.005, 0.035, 2), 120.0, 57.7, 50.0, 150.0, 25.0)
+
+
 def main():
     st.set_page_config(page_title="Heizlastberechnung", page_icon="🔥", layout="wide")
     st.title("🔥 Heizlastberechnung")
 
+    if NUMBA_AVAILABLE:
+        _warm_up_kernels()
+
     tab1, tab2 = st.tabs(["Detaillierte Berechnung", "Einfache Überschlagung (Volumen)"])
 
     # -----------------------------
@@ -128,37 +190,56 @@ def main():
             preset = st.selectbox("Gebäudestandard (Startwerte)", ["Altbau", "Teilsaniert", "Neubau", "Passivhaus"], index=1)
             p = _preset_defaults(preset)
 
-            with st.expander("Geometrie", expanded=True):
-                length_a = st.number_input("Länge A [m]", min_value=1.0, value=10.0, step=0.5)
-                length_b = st.number_input("Länge B [m]", min_value=1.0, value=5.0, step=0.5)
-                room_height = st.number_input("Raumhöhe [m]", min_value=2.0, value=3.0, step=0.1)
-                floors = st.number_input("Stockwerke", min_value=1, value=1, step=1)
-                window_area = st.number_input("Fensterfläche [m²]", min_value=0.0, value=25.0, step=1.0)
-                roof_pitch = st.slider("Dachneigung [°]", 0.0, 75.0, 30.0)
-                ridge_axis = st.selectbox("Firstachse", ["A", "B"], index=0)
-
-            with st.expander("Bauteile (U-Werte)", expanded=True):
-                u_wall = st.number_input("U Wand [W/(m²K)]", min_value=0.05, max_value=5.0, value=float(p["u_wall"]), step=0.05,
-                                         help="Typisch: Altbau ~1–2, Teilsaniert ~0.5–1, Neubau ~0.2–0.3")
-                u_window = st.number_input("U Fenster [W/(m²K)]", min_value=0.30, max_value=7.0, value=float(p["u_window"]), step=0.05,
-                                           help="Einfachverglasung ~5–6, 2-fach ~1.1–1.6, 3-fach ~0.7–1.0")
-                u_roof = st.number_input("U Dach [W/(m²K)]", min_value=0.05, max_value=5.0, value=float(p["u_roof"]), step=0.05)
-                u_floor = st.number_input("U Boden [W/(m²K)]", min_value=0.05, max_value=5.0, value=float(p["u_floor"]), step=0.05)
-
-            with st.expander("Randbedingungen", expanded=True):
-                delta_t = st.slider("Temperaturdifferenz ΔT [K]", 5.0, 35.0, 20.0,
-                                    help="ΔT = T_innen − T_außen. (Numerisch gleich zu °C-Differenz.)")
-                infiltration = st.number_input("Infiltration Hᵥ [W/(m³K)]", min_value=0.0, max_value=0.30, value=float(p["infil"]), step=0.01,
-                                               help="Sehr grobes Modell für Lüftungs-/Undichtigkeitsverluste; multipliziert mit Gebäudevolumen.")
-
-        # Berechnung + Plausibilitätschecks
-        total_kW, q_infil_kW, q_hull_kW, parts, geom = calculate_heating_demand_detailed(
+            with st.form("detailed_form"):
+                with st.expander("Geometrie", expanded=True):
+                    length_a = st.number_input("Länge A [m]", min_value=1.0, value=10.0, step=0.5)
+                    length_b = st.number_input("Länge B [m]", min_value=1.0, value=5.0, step=0.5)
+                    room_height = st.number_input("Raumhöhe [m]", min_value=2.0, value=3.0, step=0.1)
+                    floors = st.number_input("Stockwerke", min_value=1, value=1, step=1)
+                    window_area = st.number_input("Fensterfläche [m²]", min_value=0.0, value=25.0, step=1.0)
+                    roof_pitch = st.slider("Dachneigung [°]", 0.0, 75.0, 30.0)
+                    ridge_axis = st.selectbox("Firstachse", ["A", "B"], index=0)
+
+                with st.expander("Bauteile (U-Werte)", expanded=True):
+                    u_wall = st.number_input("U Wand [W/(m²K)]", min_value=0.05, max_value=5.0, value=float(p["u_wall"]), step=0.05,
+                                             help="Typisch: Altbau ~1–2, Teilsaniert ~0.5–1, Neubau ~0.2–0.3")
+                    u_window = st.number_input("U Fenster [W/(m²K)]", min_value=0.30, max_value=7.0, value=float(p["u_window"]), step=0.05,
+                                               help="Einfachverglasung ~5–6, 2-fach ~1.1–1.6, 3-fach ~0.7–1.0")
+                    u_roof = st.number_input("U Dach [W/(m²K)]", min_value=0.05, max_value=5.0, value=float(p["u_roof"]), step=0.05)
+                    u_floor = st.number_input("U Boden [W/(m²K)]", min_value=0.05, max_value=5.0, value=float(p["u_floor"]), step=0.05)
+
+                with st.expander("Randbedingungen", expanded=True):
+                    delta_t = st.slider("Temperaturdifferenz ΔT [K]", 5.0, 35.0, 20.0,
+                                        help="ΔT = T_innen − T_außen. (Numerisch gleich zu °C-Differenz.)")
+                    infiltration = st.number_input("Infiltration Hᵥ [W/(m³K)]", min_value=0.0, max_value=0.30, value=float(p["infil"]), step=0.01,
+                                                   help="Sehr grobes Modell für Lüftungs-/Undichtigkeitsverluste; multipliziert mit Gebäudevolumen.")
+
+                st.form_submit_button("Berechnen")
+
+        # Berechnung nur bei geänderten Eingaben; Formular-Widgets liefern neue Werte erst nach „Berechnen“,
+        # Reruns durch Tab-Wechsel o.ä. verwenden das gespeicherte Ergebnis.
+        inputs = (
             length_a, length_b, room_height, int(floors),
             roof_pitch, ridge_axis,
             u_wall, u_roof, u_floor,
             infiltration, delta_t,
             u_window, window_area
         )
+        delta_t_range = np.linspace(5.0, 35.0, 61)
+        if st.session_state.get("_sig_detailed") != inputs:
+            result = calculate_heating_demand_detailed(*inputs)
+            totals = sweep_delta_t(
+                delta_t_range,
+                length_a_m=length_a, length_b_m=length_b, room_height_m=room_height, floors=int(floors),
+                roof_pitch_deg=roof_pitch, ridge_axis=ridge_axis,
+                u_wall_W_m2K=u_wall, u_roof_W_m2K=u_roof, u_floor_W_m2K=u_floor,
+                infiltration_W_m3K=infiltration, u_window_W_m2K=u_window, window_area_m2=window_area,
+                dtype=np.float64,
+            )
+            st.session_state["_result_detailed"] = (result, totals, _to_json_bytes(inputs, result))
+            st.session_state["_sig_detailed"] = inputs
+        result, totals, json_bytes = st.session_state["_result_detailed"]
+        total_kW, q_infil_kW, q_hull_kW, parts, geom = result
 
         with right:
             st.markdown("### Ergebnisse")
@@ -184,6 +265,9 @@ def main():
             chart_data = {k: v for k, v in parts.items()}
             st.bar_chart(chart_data)
 
+            st.markdown("#### Sensitivität")
+            st.line_chart({"ΔT [K]": delta_t_range, "Gesamtheizlast [kW]": totals}, x="ΔT [K]")
+
             st.divider()
 
             # Details kompakt
@@ -205,33 +289,9 @@ def main():
                     st.info("Hohe U-Werte: oft große Hebel bei Sanierung (Fassade/Fenster).")
 
             # Download: Ergebnis JSON
-            result_payload = {
-                "inputs": {
-                    "length_a_m": length_a,
-                    "length_b_m": length_b,
-                    "room_height_m": room_height,
-                    "floors": int(floors),
-                    "roof_pitch_deg": roof_pitch,
-                    "ridge_axis": ridge_axis,
-                    "window_area_m2": window_area,
-                    "u_wall_W_m2K": u_wall,
-                    "u_window_W_m2K": u_window,
-                    "u_roof_W_m2K": u_roof,
-                    "u_floor_W_m2K": u_floor,
-                    "delta_t_K": delta_t,
-                    "infiltration_W_m3K": infiltration,
-                },
-                "geometry": geom,
-                "results_kW": {
-                    "total": total_kW,
-                    "hull": q_hull_kW,
-                    "infiltration": q_infil_kW,
-                    "parts": parts,
-                }
-            }
             st.download_button(
                 "Ergebnis als JSON herunterladen",
-                data=str(result_payload),
+                data=json_bytes,
                 file_name="heizlast_ergebnis.json",
                 mime="application/json"
             )
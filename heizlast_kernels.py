@@ -0,0 +1,94 @@
+"""
+Numerische Rechenkerne der Heizlastberechnung, ohne Streamlit-Abhängigkeit.
+
+Eigenes Modul, damit die (mit Numba kompilierten) Funktionen bei Streamlit-Reruns
+erhalten bleiben und für Batch-Läufe/Notebooks direkt importiert werden können.
+"""
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba ist optional – ohne Numba laufen die Rechenkerne als reines Python.
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# 1/cos(Dachneigung) für ganzzahlige Neigungen 0–75° (Bereich des Sliders); als globales
+# Array auch in Numba-kompiliertem Code lesbar (wird dort als Konstante eingebettet).
+_INV_COS_TABLE = 1.0 / np.maximum(np.cos(np.radians(np.arange(76.0))), 1e-6)
+
+
+@njit(cache=True, fastmath=True)
+def _geometry_numeric(length_a_m, length_b_m, room_height_m, floors, roof_pitch_deg, ridge_axis_is_a, window_area_m2):
+    """
+    Rechenkern zu _geometry (kompilierbar mit Numba).
+
+    Returns:
+      floor_area_single, gross_floor_area, volume, roof_area, wall_area_gross, wall_area_net, window_area
+    """
+    floor_area_single = length_a_m * length_b_m
+    gross_floor_area = floor_area_single * floors
+    volume = floor_area_single * room_height_m * floors
+
+    # vereinfachte Dachfläche (wie im Original): geneigte Fläche als Projektion / cos(pitch)
+    # Firstachse A oder B liefert dasselbe Produkt, ridge_axis_is_a beeinflusst die Fläche hier nicht
+    p = int(roof_pitch_deg)
+    if p == roof_pitch_deg and 0 <= p < _INV_COS_TABLE.shape[0]:
+        inv_cos = _INV_COS_TABLE[p]
+    else:
+        inv_cos = 1.0 / max(math.cos(math.radians(roof_pitch_deg)), 1e-6)
+    roof_area = length_a_m * length_b_m * inv_cos
+
+    wall_area_gross = (length_a_m + length_b_m) * room_height_m * floors
+    wall_area_net = max(wall_area_gross - window_area_m2, 0.0)
+
+    return floor_area_single, gross_floor_area, volume, roof_area, wall_area_gross, wall_area_net, window_area_m2
+
+
+@njit(cache=True, fastmath=True)
+def _compute_kernel(u_wall, u_roof, u_floor, u_window, infil, scale,
+                    wall_net, roof, floor_single, vol, win):
+    """
+    Reine Arithmetik U*A*ΔT bzw. H_v*V*ΔT in kW; alle Argumente dürfen NumPy-Arrays
+    sein (Broadcasting), z.B. ΔT als np.linspace für Parameterstudien.
+
+    `scale` ist ΔT/1000 (W -> kW einmal vorab statt fünfmal dividiert). Der Aufrufer
+    rechnet es im gewünschten Datentyp aus, so bleibt z.B. float32 durchgehend float32.
+
+    Returns:
+      wall_kW, roof_kW, floor_kW, window_kW, infil_kW
+    """
+    q_wall = u_wall * wall_net * scale
+    q_roof = u_roof * roof * scale
+
+    # Bodenplatte typischerweise nur EG-Grundfläche (nicht *floors)
+    q_floor = u_floor * floor_single * scale
+
+    q_window = u_window * win * scale
+    q_infil = infil * vol * scale
+    return q_wall, q_roof, q_floor, q_window, q_infil
+
+
+@njit(cache=True, fastmath=True)
+def _detailed_numeric(length_a_m, length_b_m, room_height_m, floors, roof_pitch_deg, ridge_axis_is_a,
+                      u_wall_W_m2K, u_roof_W_m2K, u_floor_W_m2K, infiltration_W_m3K, delta_t_K,
+                      u_window_W_m2K, window_area_m2):
+    """
+    Rechenkern zu calculate_heating_demand_detailed (kompilierbar mit Numba),
+    z.B. für Batch-Läufe oder Monte-Carlo-Studien ohne Streamlit.
+
+    Returns:
+      wall_kW, roof_kW, floor_kW, window_kW, infil_kW
+    """
+    floor_area_single, _, volume, roof_area, _, wall_area_net, window_area = _geometry_numeric(
+        length_a_m, length_b_m, room_height_m, floors, roof_pitch_deg, ridge_axis_is_a, window_area_m2
+    )
+    return _compute_kernel(u_wall_W_m2K, u_roof_W_m2K, u_floor_W_m2K, u_window_W_m2K, infiltration_W_m3K, delta_t_K * 1e-3,
+                           wall_area_net, roof_area, floor_area_single, volume, window_area)